@@ -1,11 +1,13 @@
-import requests
+import base64
+import functools
 import os
 import json
 import re
-import time
-from bs4 import BeautifulSoup
+import lxml.html
 from datetime import date, timedelta, datetime
 import click
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # --- Selenium Imports ---
 try:
@@ -13,26 +15,153 @@ try:
     from selenium.webdriver.common.by import By
     from selenium.webdriver.support.ui import WebDriverWait
     from selenium.webdriver.support import expected_conditions as EC
-    from selenium.common.exceptions import TimeoutException
+    from selenium.common.exceptions import TimeoutException, WebDriverException
     SELENIUM_SUPPORT = True
 except ImportError:
     SELENIUM_SUPPORT = False
 
+# --- Optional fast JSON ---
+try:
+    import orjson
+    ORJSON_SUPPORT = True
+except ImportError:
+    ORJSON_SUPPORT = False
+
 from pdf_generator import convert_causelist_to_pdf
 
 # --- Configuration ---
 BASE_URL = "https://services.ecourts.gov.in/ecourtindia_v6/"
 
+# Output folders, created once at import
+CAUSE_LIST_DIR = Path("cause_lists")
+ORDERS_DIR = Path("case_orders")
+CAUSE_LIST_DIR.mkdir(exist_ok=True)
+ORDERS_DIR.mkdir(exist_ok=True)
+
+# Ordinal suffix on a day number ("5th" -> "5") and the PDF path inside an order link's onclick
+ORDINAL_SUFFIX_RE = re.compile(r"(?<=\d)(st|nd|rd|th)\b")
+FILENAME_RE = re.compile(r"filename=([^&']+)")
+
+# PDF link in the order table after the "Final Orders / Judgements" heading (Interim Orders share the
+# table class). Candidates are elements whose own text mentions "final orders"; only those get the
+# full string-value check, so a heading split across inline tags ("Final Orders / <b>Judgements</b>")
+# still matches without lowercasing the whole document on each poll
+LOWERCASE = "translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz')"
+FINAL_ORDER_LINK_XPATH = (
+    f"//*[text()[contains({LOWERCASE}, 'final orders')]][contains({LOWERCASE}, 'final orders / judgements')]"
+    "/ancestor-or-self::*/following-sibling::table[contains(@class, 'order_table')]//a[contains(@onclick, 'filename=')]"
+)
+
+# Status rows the summary reads for a pending and for a disposed case
+PENDING_KEYS = {"Next Hearing Date", "Case Stage", "Court Number and Judge"}
+DISPOSED_KEYS = {"Decision Date", "Case Status"}
+
+# Month name -> number, so hearing dates parse without strptime's locale lookups
+MONTHS = {
+    name: number for number, name in enumerate(
+        ["January", "February", "March", "April", "May", "June", "July",
+         "August", "September", "October", "November", "December"], 1)
+}
+
+# Poll interval (seconds) for the cheap by-ID waits on the CNR search field. Waits on the CAPTCHA,
+# the cause-list form and the final-order XPath keep Selenium's default 0.5s
+FAST_POLL = 0.1
+
+# Optional "host:port" of a Chrome started with --remote-debugging-port, reused across runs
+DEBUGGER_ADDRESS = os.environ.get("ECOURTS_DEBUGGER_ADDRESS")
+
+# Requests the scraper never needs; blocked so pages finish loading sooner. Only third-party
+# text-font hosts are blocked: the portal's own icon fonts (e.g. the CAPTCHA refresh button) must load.
+# Patterns match the full URL, so they end in "*" to cover query strings like "?v=4.7.0"
+BLOCKED_URLS = [
+    "*google-analytics.com*",
+    "*googletagmanager.com*",
+    "*fonts.googleapis.com*",
+    "*fonts.gstatic.com*",
+]
+
+# Returns the first table's rows as lists of cell text, evaluated inside the browser.
+# The header row keeps <th> and <td> cells; later rows keep only <td>, so header-only rows come back empty
+TABLE_ROWS_JS = """
+var table = document.querySelector('table');
+if (!table) return [];
+return Array.from(table.rows).map(function (row, index) {
+    var cells = index === 0 ? row.cells : row.querySelectorAll(':scope > td');
+    return Array.from(cells).map(function (cell) { return cell.innerText.trim(); });
+});
+"""
+
+# Seconds allowed for the whole in-browser PDF download, including base64 encoding and the
+# transfer back over the WebDriver bridge
+PDF_DOWNLOAD_TIMEOUT = 180
+
+# Downloads a URL with the browser's own session and hands it back as a base64 data URL
+FETCH_PDF_JS = """
+var url = arguments[0], callback = arguments[arguments.length - 1];
+fetch(url, {credentials: 'include'})
+    .then(function (response) {
+        if (!response.ok) throw new Error('HTTP ' + response.status);
+        return response.blob();
+    })
+    .then(function (blob) {
+        var reader = new FileReader();
+        reader.onload = function () { callback(reader.result); };
+        reader.readAsDataURL(blob);
+    })
+    .catch(function (error) { callback('error:' + error.message); });
+"""
+
+@functools.lru_cache(maxsize=1)
+def read_config_file():
+    """Read and parse config.json once per process; raises FileNotFoundError if missing"""
+    if ORJSON_SUPPORT:
+        with open("config.json", "rb") as f:
+            return orjson.loads(f.read())
+    with open("config.json", "r") as f:
+        return json.load(f)
+
 def load_config():
-    """Load court codes from config.json"""
+    """Load court codes from config.json (a fresh copy of the cached file contents)"""
     try:
-        with open("config.json", "r") as f:
-            return json.load(f)
+        return dict(read_config_file())
     except FileNotFoundError:
         print("Error: config.json not found.")
         print("Please create it with your state_code, dist_code, and court_code.")
         return None
 
+# --- Browser Setup ---
+
+def start_driver():
+    """Starts Chrome, or opens a new tab in the running Chrome at DEBUGGER_ADDRESS."""
+    options = webdriver.ChromeOptions()
+    # Return from driver.get() at DOMContentLoaded; explicit waits gate on the elements we need
+    options.page_load_strategy = "eager"
+    if DEBUGGER_ADDRESS:
+        options.add_experimental_option("debuggerAddress", DEBUGGER_ADDRESS)
+    else:
+        options.add_experimental_option("prefs", {"profile.default_content_setting_values.notifications": 2})
+
+    driver = webdriver.Chrome(options=options)
+    driver.set_page_load_timeout(60)
+    if DEBUGGER_ADDRESS:
+        driver.switch_to.new_window("tab")
+
+    # Skip analytics and third-party web fonts; images stay on because the CAPTCHA is one
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URLS})
+    return driver
+
+def close_driver(driver):
+    """Closes the browser, or just our tab when attached to a shared Chrome."""
+    try:
+        if DEBUGGER_ADDRESS:
+            driver.close()
+    except WebDriverException:
+        # The tab may already be gone, e.g. closed by the user
+        pass
+    finally:
+        driver.quit()
+
 # --- Cause List Scraper (Interactive via Selenium) ---
 
 def download_causelist_with_selenium(config, for_date):
@@ -46,7 +175,7 @@ def download_causelist_with_selenium(config, for_date):
 
     driver = None
     try:
-        driver = webdriver.Chrome()
+        driver = start_driver()
         driver.get(BASE_URL + "?p=cause_list/index")
 
         print("\n" + "!"*60)
@@ -68,9 +197,8 @@ def download_causelist_with_selenium(config, for_date):
             WebDriverWait(driver, 60).until(
                 EC.presence_of_element_located((By.XPATH, "//table"))
             )
-            page_source = driver.page_source
-            soup = BeautifulSoup(page_source, 'lxml')
-            hearings_table = soup.find('table')
+            # Read the cell text in the browser instead of shipping the page source
+            table_rows = driver.execute_script(TABLE_ROWS_JS)
                 
         except TimeoutException:
             # Check main page if no iframe
@@ -80,46 +208,45 @@ def download_causelist_with_selenium(config, for_date):
                 EC.presence_of_element_located((By.XPATH, "//table"))
             )
             
-            page_source = driver.page_source
-            soup = BeautifulSoup(page_source, 'lxml')
+            root = lxml.html.fromstring(driver.page_source)
             
-            # Find the largest table 
-            all_tables = soup.find_all('table')
-            hearings_table = max(all_tables, key=lambda t: len(t.find_all('tr'))) if all_tables else None
-
-        if not hearings_table:
+            # Find the largest table, counting rows inside lxml
+            all_tables = root.xpath('//table')
+            hearings_table = max(all_tables, key=lambda t: t.xpath('count(.//tr)')) if all_tables else None
+            # Same shape as TABLE_ROWS_JS: header row keeps th|td, later rows only td
+            table_rows = [
+                [cell.text_content().strip() for cell in row.xpath('th|td' if index == 0 else 'td')]
+                for index, row in enumerate(hearings_table.xpath('.//tr'))
+            ] if hearings_table is not None else []
+
+        if not table_rows:
             print(" Could not find the hearings table.")
             return driver
 
-        # Extract headers and data
-        headers = [th.text.strip() for th in hearings_table.find_all('th')]
-        
-        if not headers:
-            first_row = hearings_table.find('tr')
-            if first_row:
-                headers = [td.text.strip() for td in first_row.find_all('td')]
+        # First row holds the headers, the rest are cases
+        headers, rows = table_rows[0], table_rows[1:]
         
-        rows = hearings_table.find_all('tr')[1:] if headers else hearings_table.find_all('tr')
-        
-        for row in rows:
-            cells = row.find_all('td')
+        for cells in rows:
             if len(cells) > 0:
                 if headers:
-                    case_data = {headers[i]: cell.text.strip() for i, cell in enumerate(cells) if i < len(headers)}
+                    case_data = {headers[i]: cell for i, cell in enumerate(cells) if i < len(headers)}
                 else:
-                    case_data = {f"Column_{i+1}": cell.text.strip() for i, cell in enumerate(cells)}
+                    case_data = {f"Column_{i+1}": cell for i, cell in enumerate(cells)}
                 cases.append(case_data)
 
         print(f"✓ Scraped {len(cases)} cases from the cause list.")
 
         if cases:
-            os.makedirs("cause_lists", exist_ok=True)
             timestamp = datetime.now().strftime("%H%M%S")
             filename = f"causelist_{for_date.replace('-', '_')}_{timestamp}.json"
-            save_path = os.path.join("cause_lists", filename)
+            save_path = str(CAUSE_LIST_DIR / filename)
             
-            with open(save_path, "w", encoding="utf-8") as f:
-                json.dump(cases, f, indent=2, ensure_ascii=False)
+            if ORJSON_SUPPORT:
+                with open(save_path, "wb") as f:
+                    f.write(orjson.dumps(cases, option=orjson.OPT_INDENT_2))
+            else:
+                with open(save_path, "w", encoding="utf-8") as f:
+                    json.dump(cases, f, indent=2, ensure_ascii=False)
             print(f"Success! Scraped data saved to: {save_path}")
         else:
             print(" No cases found.")
@@ -129,11 +256,11 @@ def download_causelist_with_selenium(config, for_date):
 
     except TimeoutException:
         print("\n Timed out waiting for the results to load.")
-        if driver: driver.quit()
+        if driver: close_driver(driver)
         return None
     except Exception as e:
         print(f"An error occurred: {e}")
-        if driver: driver.quit()
+        if driver: close_driver(driver)
         return None
     
 
@@ -150,18 +277,18 @@ def search_case_status(cnr):
 
     driver = None
     try:
-        driver = webdriver.Chrome()
+        driver = start_driver()
         driver.get(BASE_URL)
 
         print("Navigating to CNR Search page...")
-        WebDriverWait(driver, 30).until(EC.element_to_be_clickable((By.ID, "cino"))).click()
+        WebDriverWait(driver, 30, poll_frequency=FAST_POLL).until(EC.element_to_be_clickable((By.ID, "cino"))).click()
 
         print("Entering CNR Number...")
-        cnr_input_field = WebDriverWait(driver, 50).until(EC.presence_of_element_located((By.ID, "cino")))
+        cnr_input_field = WebDriverWait(driver, 50, poll_frequency=FAST_POLL).until(EC.presence_of_element_located((By.ID, "cino")))
         cnr_input_field.send_keys(cnr)
 
         print("\n" + "!" * 60)
-        print("ACTION REQUIRED: Please solve CAPTCHA and click 'Search'.")
+        print(f"ACTION REQUIRED: Please solve CAPTCHA for CNR {cnr} and click 'Search'.")
         print("The script will wait for the results to load.")
         print("!" * 60 + "\n")
 
@@ -174,13 +301,12 @@ def search_case_status(cnr):
     except TimeoutException:
         print("Timeout: CAPTCHA not solved or invalid CNR.")
         if driver:
-            time.sleep(30)
-            driver.quit()
+            close_driver(driver)
         return None, None
     except Exception as e:
         print(f"Error during browser automation: {e}")
         if driver:
-            driver.quit()
+            close_driver(driver)
         return None, None
 
 # --- HTML Parser for Case Details ---
@@ -188,21 +314,21 @@ def search_case_status(cnr):
 def parse_and_display_results(page_source):
     """Parses the HTML to find and display case status and listing info."""
     print("\n--- Parsing Page for Case Details ---")
-    soup = BeautifulSoup(page_source, "lxml")
+    root = lxml.html.fromstring(page_source)
 
     # Locate main status table
-    status_table = soup.find("table", class_="case_status_table")
-    if not status_table:
+    status_tables = root.xpath("//table[contains(@class, 'case_status_table')]")
+    if not status_tables:
         print("Critical: Could not find the main 'case_status_table'.")
         return
 
+    # Key/value rows are those with at least two cells; stop once a summary can be printed
     all_details = {}
-    for row in status_table.find_all("tr"):
-        cells = row.find_all("td")
-        if len(cells) >= 2:
-            key = cells[0].text.strip()
-            value = cells[1].text.strip()
-            all_details[key] = value
+    for row in status_tables[0].xpath(".//tr[td[2]]"):
+        cells = row.findall("td")
+        all_details[cells[0].text_content().strip()] = cells[1].text_content().strip()
+        if PENDING_KEYS <= all_details.keys() or DISPOSED_KEYS <= all_details.keys():
+            break
 
     print("\n--- Case Details ---")
 
@@ -223,9 +349,10 @@ def parse_and_display_results(page_source):
     if next_hearing_date_str:
         hearing_date_obj = None
         try:
-            cleaned_date_str = next_hearing_date_str.replace('st', '').replace('nd', '').replace('rd', '').replace('th', '')
-            hearing_date_obj = datetime.strptime(cleaned_date_str, '%d %B %Y').date()
-        except ValueError:
+            cleaned_date_str = ORDINAL_SUFFIX_RE.sub('', next_hearing_date_str)
+            day, month, year = cleaned_date_str.split()
+            hearing_date_obj = date(int(year), MONTHS[month.capitalize()], int(day))
+        except (ValueError, KeyError):
             print(f"Could not parse the date format: {next_hearing_date_str}")
 
         if hearing_date_obj:
@@ -253,16 +380,12 @@ def download_final_order(driver, page_source):
     print("=" * 60)
 
     try:
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.XPATH, "//*[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'final orders / judgements')]"))
-        )
-
         order_link_element = WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.XPATH, "//*[contains(translate(., 'ABCDEFGHIJKLMNOPQRSTUVWXYZ', 'abcdefghijklmnopqrstuvwxyz'), 'final orders / judgements')]/following-sibling::table[contains(@class, 'order_table')]//a"))
+            EC.presence_of_element_located((By.XPATH, FINAL_ORDER_LINK_XPATH))
         )
 
         onclick_text = order_link_element.get_attribute("onclick")
-        match = re.search(r"filename=([^&']+)", onclick_text)
+        match = FILENAME_RE.search(onclick_text)
         if not match:
             print("Could not extract PDF link.")
             return
@@ -271,28 +394,45 @@ def download_final_order(driver, page_source):
         pdf_url = "https://services.ecourts.gov.in" + pdf_path
         print(f"PDF link found: {pdf_url}")
 
-        session = requests.Session()
-        for cookie in driver.get_cookies():
-            session.cookies.set(cookie['name'], cookie['value'])
-        headers = {'Referer': driver.current_url}
-        response = session.get(pdf_url, headers=headers, timeout=30)
-        response.raise_for_status()
+        # Fetch inside the browser so the portal sees its own session cookies. The whole PDF is held
+        # in memory (as a base64 data URL, ~1.33x its size) rather than streamed to disk
+        driver.set_script_timeout(PDF_DOWNLOAD_TIMEOUT)
+        try:
+            result = driver.execute_async_script(FETCH_PDF_JS, pdf_url)
+        except TimeoutException:
+            print("Timed out while downloading the PDF.")
+            return
+        if result.startswith("error:"):
+            print(f"Server error while downloading PDF: {result[len('error:'):]}")
+            return
+        if "," not in result:
+            print("Server returned an empty PDF.")
+            return
 
-        os.makedirs("case_orders", exist_ok=True)
-        save_path = os.path.join("case_orders", os.path.basename(pdf_path))
+        save_path = ORDERS_DIR / os.path.basename(pdf_path)
         with open(save_path, "wb") as f:
-            f.write(response.content)
+            f.write(base64.b64decode(result.split(",", 1)[1]))
         print(f"PDF saved to: {save_path}")
 
     except TimeoutException:
         print("No 'Final Orders / Judgements' section found or it is empty.")
-    except requests.exceptions.HTTPError as e:
-        print(f"Server error while downloading PDF: {e}")
     except Exception as e:
         print(f"Unexpected error: {e}")
 
 # --- CLI Commands ---
 
+def show_case_results(driver, page_source, download_pdf):
+    """Prints the case details, optionally downloads the final order, then closes the browser."""
+    try:
+        if page_source:
+            parse_and_display_results(page_source)
+            if download_pdf:
+                download_final_order(driver, page_source)
+    finally:
+        if driver:
+            print("\nClosing browser...")
+            close_driver(driver)
+
 @click.group()
 def cli():
     """eCourts Scraper: Search case status or download cause lists."""
@@ -303,13 +443,33 @@ def cli():
 @click.option("--download-pdf", is_flag=True, help="Download final order PDF if available.")
 def search(cnr, download_pdf):
     driver, page_source = search_case_status(cnr)
-    if page_source:
-        parse_and_display_results(page_source)
-        if download_pdf:
-            download_final_order(driver, page_source)
-    if driver:
-        print("\nClosing browser...")
-        driver.quit()
+    show_case_results(driver, page_source, download_pdf)
+
+@cli.command(help="Search several cases at once, one browser window (or tab) per worker.")
+@click.option("--cnrs", "cnr_file", required=True, type=click.Path(exists=True, dir_okay=False), help="Text file with one CNR number per line; blank lines and lines starting with '#' are skipped.")
+@click.option("--workers", default=3, show_default=True, type=click.IntRange(min=1), help="Number of cases to drive in parallel.")
+@click.option("--download-pdf", is_flag=True, help="Download final order PDFs if available.")
+def search_batch(cnr_file, workers, download_pdf):
+    with open(cnr_file, "r") as f:
+        cnrs = [line.strip() for line in f]
+    cnrs = [cnr for cnr in cnrs if cnr and not cnr.startswith("#")]
+    if not cnrs:
+        print("No CNR numbers found in the file.")
+        return
+
+    # Each worker owns its own WebDriver session, so no driver is shared across threads.
+    # With ECOURTS_DEBUGGER_ADDRESS set they all open tabs in the same Chrome.
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(search_case_status, cnr): cnr for cnr in cnrs}
+        for future in as_completed(futures):
+            cnr = futures[future]
+            print(f"\n### Results for CNR {cnr} ###")
+            # One failed case must not stop the batch or leave the other browsers open
+            try:
+                driver, page_source = future.result()
+                show_case_results(driver, page_source, download_pdf)
+            except Exception as e:
+                print(f"Search for CNR {cnr} failed: {e}")
 
 @cli.command(help="[Req #5] Interactively download the entire cause list for a court.")
 @click.option("--today", is_flag=True, default=True, help="Fetch for today (default).")
@@ -332,7 +492,7 @@ def download_causelist(today, tomorrow):
         convert_causelist_to_pdf(json_path)
     if driver:
         print("\nClosing browser...")
-        driver.quit()
+        close_driver(driver)
 
 # --- Entry Point ---
 